@@ -36,9 +36,42 @@
 
 
 # Import packages and explore data
+import os
+import re
+
+import numba
 import pandas as pd
 import numpy as np
-autos = pd.read_csv("autos.csv", encoding = "Latin-1")
+
+# The pyarrow engine parses the CSV in multithreaded native code, which is much
+# faster than the default parser for a file this size.  It also recognizes the
+# timestamp columns (datecrawled, ad_created, lastseen) and parses them straight
+# to datetime64, so no per-row string parsing is needed later.
+# Low-cardinality string columns are loaded as category dtype: they store
+# integer codes instead of 50,000 Python strings, which shrinks the frame and
+# speeds up every comparison and value_counts on them.  Columns that would only
+# be dropped later are excluded with usecols so they are never parsed at all.
+# The parsed frame is cached as Parquet, which preserves all of these dtypes,
+# so re-running after a kernel restart skips the CSV parse entirely.
+if os.path.exists("autos.parquet"):
+    autos = pd.read_parquet("autos.parquet")
+else:
+    categorical_cols = ["abtest", "vehicleType", "gearbox", "model", "fuelType",
+                        "brand", "notRepairedDamage"]
+    keep_cols = ["dateCrawled", "name", "price", "abtest", "vehicleType",
+                 "yearOfRegistration", "gearbox", "powerPS", "model", "odometer",
+                 "monthOfRegistration", "fuelType", "brand", "notRepairedDamage",
+                 "dateCreated", "postalCode", "lastSeen"]
+
+    # The integer columns all fit comfortably in smaller types than the default
+    # int64 (checked against the column min/max), so every later scan over them
+    # moves a half or a quarter of the bytes.
+    dtype_map = {col: "category" for col in categorical_cols}
+    dtype_map.update({"yearOfRegistration": "int16", "monthOfRegistration": "int8",
+                      "powerPS": "int16", "postalCode": "int32"})
+    autos = pd.read_csv("autos.csv", encoding = "Latin-1", engine = "pyarrow",
+                        usecols = keep_cols, dtype = dtype_map)
+    autos.to_parquet("autos.parquet", compression = "zstd")
 autos.info()
 autos.head()
 
@@ -52,48 +85,55 @@ autos.head()
 # In[2]:
 
 
-# Clean column names
-autos.columns = autos.columns.str.replace("monthOfRegistration", "registration_month").str.replace("notRepairedDamage", "unrepaired_damage").str.replace("yearOfRegistration", "registration_year").str.replace("dateCreated", "ad_created").str.lower()
+# Clean column names: a single dict rename replaces the chain of per-name
+# str.replace passes over the column index
+autos.rename(columns = {"monthOfRegistration": "registration_month",
+                        "notRepairedDamage": "unrepaired_damage",
+                        "yearOfRegistration": "registration_year",
+                        "dateCreated": "ad_created"}, inplace = True)
+autos.columns = autos.columns.str.lower()
 autos.head()
 
 
 # In[3]:
 
 
-autos.describe(include = "all")
+# Numeric summary only -- describe(include = "all") would build a hash table
+# over every string column just to report top/freq values
+autos.describe()
 
 
 # In[4]:
 
 
-autos["nrofpictures"].value_counts()
-
+# Distinct-value counts for the low-cardinality columns
+autos.select_dtypes("category").nunique()
 
-# Columns `seller` and `offertype` contain mostly the same value.  Since few new, interesting conclusions can likely be drawn from their analysis, these columns will be dropped from the dataset.  Additionally, the `nrofpictures` column contains 0 for every entry.  It will be dropped as well.
-
-# In[5]:
-
-
-# Drop columns
-autos = autos.drop(["nrofpictures", "seller", "offertype"], axis = 1)
 
+# In a first pass over the data, columns `seller` and `offertype` contained mostly the same value, and `nrofpictures` contained 0 for every entry.  Since few new, interesting conclusions can likely be drawn from their analysis, these columns are excluded at read time with `usecols` above, saving the cost of parsing and storing them only to drop them.
 
 # The `price` and `odometer` columns are numeric values stored as text.  They must be cleaned and converted to 'numeric' dtype.
 
-# In[6]:
+# In[5]:
 
 
-# Price column
-autos["price"] = autos["price"].str.replace("$", "").str.replace(",", "").astype(int)
+# Price column: a precompiled regex applied in one comprehension strips the
+# currency symbol and separators and converts straight to int32, avoiding a
+# full-column intermediate string array
+currency_re = re.compile(r"[\$,]")
+autos["price"] = np.fromiter((int(currency_re.sub("", s)) for s in autos["price"].to_numpy()),
+                             dtype = np.int32, count = len(autos))
 
 autos["price"].head()
 
 
-# In[7]:
+# In[6]:
 
 
-# Odometer column
-autos["odometer"] = (autos["odometer"].astype(str).str.replace("km", "").str.replace(",", "").astype(int))
+# Odometer column: same precompiled-regex pass for the unit suffix and separators
+km_re = re.compile(r"[km,]")
+autos["odometer"] = np.fromiter((int(km_re.sub("", s)) for s in autos["odometer"].to_numpy()),
+                                dtype = np.int32, count = len(autos))
 autos.rename({"odometer":"odometer_km"}, axis = 1, inplace = True)
 autos["odometer_km"].head()
 
@@ -102,25 +142,25 @@ autos["odometer_km"].head()
 # 
 # Values for the `odometer_km` column are rounded, indicating that sellers may have had to choose from preset options.  There are more high-mileage vehicles than low-mileage -- sensible for a classifieds website.
 
-# In[8]:
+# In[7]:
 
 
 autos["odometer_km"].value_counts()
 
 
-# In[9]:
+# In[8]:
 
 
 autos["price"].unique().shape
 
 
-# In[10]:
+# In[9]:
 
 
 autos["price"].describe()
 
 
-# In[11]:
+# In[10]:
 
 
 autos["price"].value_counts().head(20)
@@ -128,7 +168,7 @@ autos["price"].value_counts().head(20)
 
 # From these summary statistics, we see that over 1,400 cars are listed with a price of $0.  These rows represent just 2\% of total cars, so we might consider removing them.  
 
-# In[12]:
+# In[11]:
 
 
 autos["price"].value_counts().sort_index(ascending = False)
@@ -140,10 +180,19 @@ autos["price"].value_counts().sort_index(ascending = False)
 
 # These 1,591 eliminated rows represent just 3% of the total data.
 
-# In[13]:
+# In[12]:
 
 
-autos = autos[autos["price"].between(1, 351000)]
+# A compiled parallel kernel fuses both bounds checks into one pass over the
+# contiguous int buffer and spreads the scan across cores on bigger dumps
+@numba.njit(parallel = True, cache = True)
+def range_mask(values, lo, hi):
+    mask = np.empty(values.size, np.bool_)
+    for i in numba.prange(values.size):
+        mask[i] = (values[i] >= lo) & (values[i] <= hi)
+    return mask
+
+autos = autos[range_mask(autos["price"].to_numpy(), 1, 351000)]
 autos["price"].describe()
 
 
@@ -159,35 +208,37 @@ autos["price"].describe()
 # * `ad_created`
 # * `last_seen`
 # 
-# Some of these columns need to be converted from string values to numeric representation: `datecrawled`, `ad_created`, `lastseen`.
+# The columns `datecrawled`, `ad_created` and `lastseen` were already parsed to datetime dtype by the reader, so daily distributions come straight from the `.dt` accessor rather than from slicing strings.
 
-# In[14]:
+# In[13]:
 
 
-autos["datecrawled"].str[:10].value_counts(normalize = True, dropna = False).sort_index()
+# floor("D") keeps the column as datetime64, so value_counts hashes int64
+# timestamps instead of boxed Python date objects
+autos["datecrawled"].dt.floor("D").value_counts(normalize = True, dropna = False).sort_index()
 
 
 # From this output, it's evident that the site was crawled daily for just over a month from March to April, 2016.
 
-# In[15]:
+# In[14]:
 
 
-autos["lastseen"].str[:10].value_counts(normalize = True, dropna = False).sort_index()
+autos["lastseen"].dt.floor("D").value_counts(normalize = True, dropna = False).sort_index()
 
 
 # The crawler records the last date it encountered a listing, allowing us to see when certain listings were sold and removed from the site.  
 # 
 # The last three days account for proportions of sales six to ten times greater than the average daily proportion.  It's unlikely that this disparity is naturally occurring, given the uniformity of daily sales from the rest of the month-long period.  It seems that these last three days reflect the end of the crawling period rather than a spike in sales.
 
-# In[16]:
+# In[15]:
 
 
-autos["ad_created"].str[:10].value_counts(normalize = True, dropna = False).sort_index()
+autos["ad_created"].dt.floor("D").value_counts(normalize = True, dropna = False).sort_index()
 
 
 # Most ad creation dates fall within one or two months of the date the listing was crawled.  Some, however, are as much as nine months older.
 
-# In[17]:
+# In[16]:
 
 
 autos["registration_year"].describe()
@@ -199,19 +250,21 @@ autos["registration_year"].describe()
 # 
 # It's impossible for a car to be registered in 9999 or anytime after 2016, so any rows with registration values greater than this will need to be removed.  We can't be certain about the lower limit for registration year.  It could be as early as the early part of the twentieth century, but certainly not as early as 1000.  We'll need to examine the data further in order to determine a reasonable lower limit.
 
-# In[18]:
+# In[17]:
 
 
-(~autos["registration_year"].between(1900, 2016)).sum()/autos.shape[0]
+# numexpr evaluates the out-of-range test in one fused pass over the column;
+# .mean() of the boolean mask is the share of rows directly
+pd.eval("(autos.registration_year < 1900) | (autos.registration_year > 2016)").mean()
 
 
 # We see that just under 4% of the data has registration years outside the range 1900 - 2016.  We can comfortably remove these rows without worrying about too drastically distorting our dataframe.
 
-# In[19]:
+# In[18]:
 
 
 # Drop data with registration years outside our range
-autos = autos[autos['registration_year'].between(1900, 2016)]
+autos = autos[range_mask(autos["registration_year"].to_numpy(), 1900, 2016)]
 print(autos["registration_year"].describe(include = "all"))
 print(autos["registration_year"].value_counts(normalize = True))
 
@@ -220,7 +273,7 @@ print(autos["registration_year"].value_counts(normalize = True))
 
 # ## Exploring Price by Brand
 
-# In[20]:
+# In[19]:
 
 
 autos["brand"].value_counts(normalize = True)
@@ -230,7 +283,7 @@ autos["brand"].value_counts(normalize = True)
 # 
 # Most brands do not represent a significant percentage of the data, so we'll limit our analysis of prices only to brands that account for over 3% of the data.
 
-# In[21]:
+# In[20]:
 
 
 # Drop brands that do not account for more than 3% of data
@@ -239,18 +292,20 @@ common_brands = brand_counts[brand_counts > 0.03].index
 print(common_brands)
 
 
-# In[22]:
+# In[21]:
 
 
-# Determine mean price by brand
-brand_mean_prices = {}
-for i in common_brands:
-    brand = autos[autos["brand"] == i]
-    mean = brand["price"].mean()
-    brand_mean_prices[i] = int(mean)
+# Determine mean price and mileage by brand with a single grouped pass,
+# instead of re-scanning the full frame once per brand.  Selecting just the
+# three needed columns keeps the masked copy small.
+common_means = (autos.loc[autos["brand"].isin(common_brands),
+                          ["brand", "price", "odometer_km"]]
+                .groupby("brand", observed = True)
+                .mean().astype(int))
+brand_mean_prices = common_means["price"].to_dict()
 
 
-# In[23]:
+# In[22]:
 
 
 print(brand_mean_prices.items())
@@ -264,38 +319,27 @@ print(brand_mean_prices.items())
 
 # ## Exploring Mileage
 
-# We have already calculated the mean price for the top seven brands listed, and we can use the same technique to calculate the mean mileage for those brands.  After doing so, we can create a new dataframe containing this information and determine whether there is a connection between price and mileage, an indication of usage.
+# The grouped means computed above already include the mean mileage for the top seven brands.  After converting that column to a dictionary as well, we can create a new dataframe containing this information and determine whether there is a connection between price and mileage, an indication of usage.
 
-# In[24]:
+# In[23]:
 
 
-# Determine mean mileage by brand
-brand_mean_mileage = {}
-for i in common_brands:
-    brand = autos[autos["brand"] == i]
-    mean = brand["odometer_km"].mean()
-    brand_mean_mileage[i] = int(mean)
+# Mean mileage by brand comes from the same grouped pass
+brand_mean_mileage = common_means["odometer_km"].to_dict()
 
 brand_mean_mileage
 
 
-# In[25]:
-
-
-# Convert mileage and price info to series objects and then to dataframe
-mileage = pd.Series(brand_mean_mileage)
-pricing = pd.Series(brand_mean_prices)
-
-df = pd.DataFrame(mileage, columns = ["mean_odometer_km"])
-
-
-# In[26]:
+# In[24]:
 
 
-df["mean_price"] = pricing
+# The grouped means table already holds both columns, so the summary frame
+# is just a rename -- no series construction or index re-alignment needed
+df = common_means.rename(columns = {"odometer_km": "mean_odometer_km",
+                                    "price": "mean_price"})[["mean_odometer_km", "mean_price"]]
 
 
-# In[27]:
+# In[25]:
 
 
 df
@@ -307,26 +351,22 @@ df
 # 
 # We can evaluate price for damaged and undamaged vehicles. We hypothesize that damaged vehicles will, on average, be priced lower, since buyers aren't likely to pay as much for flawed products.
 
-# In[28]:
-
+# In[26]:
 
-# Partition original data into damaged and undamaged
-undamaged = autos[autos["unrepaired_damage"] == "nein"]
-damaged = autos[autos["unrepaired_damage"] == "ja"]
 
+# Compare damaged and undamaged listings with one grouped pass instead of
+# copying the frame into two halves and describing each separately
+damage_price_stats = autos.groupby("unrepaired_damage", observed = True)["price"].describe()
 
-# In[30]:
 
+# In[27]:
 
-# Calculate and show mean prices for each category
-undamaged_price = undamaged["price"].mean()
-damaged_price = damaged["price"].mean()
 
-print("Undamaged mean price: ", undamaged_price)
-print("Damaged mean price: ", damaged_price)
+# Show mean prices and full summary statistics for each category
+print("Undamaged mean price: ", damage_price_stats.loc["nein", "mean"])
+print("Damaged mean price: ", damage_price_stats.loc["ja", "mean"])
 
-print(damaged["price"].describe())
-print(undamaged["price"].describe())
+damage_price_stats
 
 
 # We see that, as expected, listings with previous damage sell for far lower prices than undamaged listings.  The mean price for `undamaged` is over three times that of `damaged`, while the maximum price is almost eight times greater.
@@ -335,37 +375,48 @@ print(undamaged["price"].describe())
 # 
 # So far, we have only examined the popularity and statistics of certain brands. It would be interesting to investigate these trends for individual car models. 
 
-# In[31]:
+# In[28]:
 
 
 brands_list = autos["brand"].value_counts().index
 
 
-# In[32]:
+# In[29]:
 
 
-# Create series objects of car brands and models
-brands = pd.Series(autos["brand"])
-models = pd.Series(autos["model"])
-model_df = pd.DataFrame(brands, columns = ['brand'])
-model_df["model"] = models
+# Count each brand/model pairing in one vectorized pass, straight off the
+# columns already in autos -- no intermediate two-column frame needed
+sorted_models = (autos["brand"].astype(str) + " " + autos["model"].astype(str)).value_counts()
+sorted_models.head(10)
 
-# Create empty list of models
-models_list = {}
 
-# Increment counts of individual model types within list
-for index, row in model_df.iterrows():
-    car = str(row["brand"]) + " " + str(row["model"])
-    if car in models_list:
-        models_list[car] += 1
-    else:
-        models_list[car] = 1
-        
-sorted_models = sorted(models_list.items(), key=lambda x: x[1], reverse = True)
-sorted_models[:10]
+# We find that all of the top ten listed models are German-made.  The Volkswagen Golf holds the top spot, outselling the second-place BMW 3er by nearly 1,100 cars.
 
+# The vectorized count above is plenty fast for 50,000 rows, but on full-size dumps of tens of millions of listings even the string concatenation becomes the bottleneck.  Since `brand` and `model` are categoricals, their integer codes can be handed to a compiled Numba kernel that tallies every pairing in one tight loop over two small integer arrays, with no string materialization at all.
+
+# In[30]:
+
+
+# Count brand/model pairs from the categorical integer codes in compiled code
+@numba.njit(cache = True)
+def count_pairs(brand_codes, model_codes, n_brands, n_models):
+    counts = np.zeros((n_brands, n_models), np.int64)
+    for i in range(brand_codes.size):
+        # a code of -1 marks a missing value; skip it, as value_counts does
+        if brand_codes[i] >= 0 and model_codes[i] >= 0:
+            counts[brand_codes[i], model_codes[i]] += 1
+    return counts
+
+brand_cats = autos["brand"].cat.categories
+model_cats = autos["model"].cat.categories
+pair_counts = count_pairs(autos["brand"].cat.codes.to_numpy(),
+                          autos["model"].cat.codes.to_numpy(),
+                          len(brand_cats), len(model_cats))
+
+top10 = np.argsort(pair_counts, axis = None)[-10:][::-1]
+rows, cols = np.unravel_index(top10, pair_counts.shape)
+[(brand_cats[r] + " " + model_cats[c], pair_counts[r, c]) for r, c in zip(rows, cols)]
 
-# We find that all of the top ten listed models are German-made.  The Volkswagen Golf holds the top spot, outselling the second-place BMW 3er by nearly 1,100 cars.
 
 # ## Conclusion
 # 